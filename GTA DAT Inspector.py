@@ -6,7 +6,7 @@ Features:
  - Inspect nodes.dat & chase.dat (20/28 byte variants)
  - Convert single chase.dat -> nodes.dat
  - Batch convert all .dat files in a folder
- - Threaded conversions with progress bar
+ - Parallel (process pool) conversions with progress bar
  - Backup originals, logs, config persistence
  - CLI mode for headless batch conversion
 """
@@ -16,15 +16,24 @@ from tkinter import filedialog, messagebox, ttk, scrolledtext
 import struct
 import os
 import json
+import ctypes
+import mmap
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime
 import argparse
+import asyncio
+import multiprocessing
 import shutil
 import threading
 import queue
 import sys
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the struct path below is used without it
+    np = None
+
 # ------------ Defaults & helpers ------------
 HOME = Path.home()
 CONFIG_PATH = HOME / ".gta_dat_tool_config.json"
@@ -36,6 +45,10 @@ DEFAULT_CONFIG = {
     "flags": 0,
     "backup": True,
     "threads": 4,
+    "verbose_log": False,
+    "per_file_log": False,
+    "batch_log": True,
+    "multiprocess": True,
     "max_preview": 200
 }
 
@@ -44,6 +57,29 @@ FMT_20 = "<fffhhhh"     # 20-byte variant (x,y,z + 4 shorts)
 NODES_ENTRY_FMT = "<II3hHHHHBBI"
 HEADER_FMT = "<IIIII"
 
+# Precompiled so the struct path doesn't re-parse format strings per entry
+S_28 = struct.Struct(FMT_28)
+S_20 = struct.Struct(FMT_20)
+S_NODE = struct.Struct(NODES_ENTRY_FMT)
+S_HEADER = struct.Struct(HEADER_FMT)
+SIZE_28 = S_28.size
+SIZE_20 = S_20.size
+NODES_ENTRY_SIZE = S_NODE.size
+HEADER_SIZE = S_HEADER.size
+# Same records, unpacking only the (x,y,z) floats (12 bytes, last in a 28-byte
+# record, first in a 20-byte one); padding skips the rest
+S_28_POS = struct.Struct(f"<{SIZE_28 - 12}xfff")
+S_20_POS = struct.Struct(f"<fff{SIZE_20 - 12}x")
+
+if np is not None:
+    # Structured views of the same layouts, for bulk parsing with np.frombuffer
+    DT_28 = np.dtype([("a", "<i2"), ("b", "<i2"), ("c", "<i2"), ("bytes", "i1", 10), ("pos", "<f4", 3)])
+    DT_20 = np.dtype([("pos", "<f4", 3), ("s", "<i2", 4)])
+    # Same record as NODES_ENTRY_FMT
+    NODE_DT = np.dtype([("mem_addr", "<u4"), ("unused", "<u4"), ("pos", "<i2", 3), ("marker", "<u2"),
+                        ("link_offset", "<u2"), ("area_id", "<u2"), ("node_id", "<u2"), ("width", "u1"),
+                        ("node_type", "u1"), ("flags", "<u4")])
+
 # Thread-safe UI queue
 ui_q = queue.Queue()
 
@@ -66,48 +102,110 @@ def save_config(conf):
 def now():
     return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
+def map_file(path: Path):
+    """
+    Read-only memory map of a file (bytes for empty files, which can't be
+    mapped). Parsers read straight from the page cache instead of a copy;
+    the map closes once the last reference to it (or a view of it) is gone.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def prefetch_files(paths):
+    """
+    Hint the kernel to start reading files into the page cache so the
+    workers' reads don't block on disk. No-op where posix_fadvise is missing.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for p in paths:
+        try:
+            fd = os.open(p, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def write_file(path: Path, data):
+    """Write data straight to the file descriptor, without an extra buffered copy."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 # ------------ Core parsing & conversion logic ------------
-def detect_chase_variant(data: bytes):
-    if len(data) % 28 == 0:
-        return 28
-    if len(data) % 20 == 0:
-        return 20
+def _parse28(data):
+    if np is not None:
+        return np.ascontiguousarray(np.frombuffer(data, dtype=DT_28)["pos"])
+    # in fmt we used earlier, pos floats are last 3 fields
+    return list(S_28_POS.iter_unpack(data))
+
+def _parse20(data):
+    if np is not None:
+        return np.ascontiguousarray(np.frombuffer(data, dtype=DT_20)["pos"])
+    return list(S_20_POS.iter_unpack(data))
+
+# entry size -> parser, in detection order (28 wins when both divide)
+CHASE_PARSERS = {SIZE_28: _parse28, SIZE_20: _parse20}
+
+def variant_for_size(size: int):
+    """Chase entry size for a file of `size` bytes (None if neither divides it)."""
+    for variant in CHASE_PARSERS:
+        if size % variant == 0:
+            return variant
     return None
 
-def parse_chase_positions(data: bytes):
-    """Return list of (x,y,z) floats parsed from either 28- or 20-byte variant."""
+def detect_chase_variant(data: bytes):
+    return variant_for_size(len(data))
+
+def parse_chase_positions(data):
+    """
+    Return (positions, variant) parsed from either 28- or 20-byte variant.
+    data may be bytes, a memoryview or an mmap.
+    positions is an (N,3) float32 ndarray when numpy is available,
+    otherwise a list of (x,y,z) floats.
+    """
     variant = detect_chase_variant(data)
-    if variant == 28:
-        entries = []
-        count = len(data) // 28
-        for i in range(count):
-            chunk = data[i*28:(i+1)*28]
-            unpacked = struct.unpack(FMT_28, chunk)
-            # in fmt we used earlier, pos floats are last 3 fields
-            px, py, pz = unpacked[13], unpacked[14], unpacked[15]
-            entries.append((px, py, pz))
-        return entries, 28
-    elif variant == 20:
-        entries = []
-        count = len(data) // 20
-        for i in range(count):
-            chunk = data[i*20:(i+1)*20]
-            x, y, z, *_ = struct.unpack(FMT_20, chunk)
-            entries.append((x, y, z))
-        return entries, 20
-    else:
+    if variant is None:
         return None, None
+    return CHASE_PARSERS[variant](data), variant
 
-def convert_positions_to_nodes(entries, multiplier, defaults):
+def _node_defaults(defaults):
+    """Masked (area_id, width, node_type, flags) shared by every entry."""
+    return (int(defaults.get("area_id", 0)) & 0xFFFF,
+            int(defaults.get("width", 0)) & 0xFFFF,
+            int(defaults.get("node_type", 0)) & 0xFF,
+            int(defaults.get("flags", 0)) & 0xFF)
+
+def convert_positions_to_nodes(entries, multiplier, defaults, verbose=False):
     """
-    entries: list of (px,py,pz) floats
+    entries: (N,3) ndarray or list of (px,py,pz) floats
     multiplier: how to convert float->node integer (hw used 8.0)
     defaults: dict with area_id, width, node_type, flags
-    returns bytes for nodes.dat and log lines
+    verbose: build one log line per entry (empty list otherwise)
+    returns nodes.dat contents (bytearray), log lines and clipped count
     """
-    node_bytes = bytearray()
+    if np is not None and isinstance(entries, np.ndarray):
+        return _convert_array_to_nodes(entries, multiplier, defaults, verbose)
+    # header + all entries in one preallocated buffer, packed in place
+    node_bytes = bytearray(HEADER_SIZE + NODES_ENTRY_SIZE * len(entries))
+    S_HEADER.pack_into(node_bytes, 0, len(entries), 0, 0, 0, 0)
     log_lines = []
     clipped = 0
+    mem_addr = 0
+    unused = 0
+    marker = 0
+    link_offset = 0
+    area_id, width, node_type, flags = _node_defaults(defaults)
     for idx, (px, py, pz) in enumerate(entries):
         xi = int(round(px * multiplier))
         yi = int(round(py * multiplier))
@@ -120,24 +218,178 @@ def convert_positions_to_nodes(entries, multiplier, defaults):
             yi = max(-32768, min(32767, yi))
             zi = max(-32768, min(32767, zi))
 
-        mem_addr = 0
-        unused = 0
-        marker = 0
-        link_offset = 0
-        area_id = int(defaults.get("area_id", 0)) & 0xFFFF
         node_id = idx & 0xFFFF
-        width = int(defaults.get("width", 0)) & 0xFFFF
-        node_type = int(defaults.get("node_type", 0)) & 0xFF
-        flags = int(defaults.get("flags", 0)) & 0xFF
 
-        packed = struct.pack(NODES_ENTRY_FMT, mem_addr, unused, xi, yi, zi, marker, link_offset, area_id, node_id, width, node_type, flags)
-        node_bytes.extend(packed)
-        log_lines.append(f"{idx}: pos=({px:.3f},{py:.3f},{pz:.3f}) -> nodePos=({xi},{yi},{zi}) id={node_id}")
+        S_NODE.pack_into(node_bytes, HEADER_SIZE + idx * NODES_ENTRY_SIZE, mem_addr, unused, xi, yi, zi, marker, link_offset, area_id, node_id, width, node_type, flags)
+        if verbose:
+            log_lines.append(f"{idx}: pos=({px:.3f},{py:.3f},{pz:.3f}) -> nodePos=({xi},{yi},{zi}) id={node_id}")
+
+    return node_bytes, log_lines, clipped
 
-    header = struct.pack(HEADER_FMT, len(entries), 0, 0, 0, 0)
-    return header + node_bytes, log_lines, clipped
+# Importing numba and compiling the kernel costs ~0.45s per process (no on-disk
+# cache, and pool workers are spawned), so the first call only pays off once the
+# warm-loop savings cover it. Measured first call, numba vs numpy path:
+#   1M entries: 471 vs 38ms, 4M: 459 vs 194ms, 8M: 557 vs 390ms, 16M: 752 vs 825ms
+NUMBA_MIN_ENTRIES = 1 << 24
+
+def _quantize_loop(positions, multiplier, out):
+    """Scale/round/clip (N,3) positions into int16 out. Returns clipped count, -1 on NaN/inf."""
+    clipped = 0
+    for i in range(positions.shape[0]):
+        row_clipped = False
+        for j in range(3):
+            # float64 multiply + round-half-even, same as the struct path
+            v = np.rint(positions[i, j] * multiplier)
+            if not np.isfinite(v):
+                return -1
+            if v < -32768:
+                v = -32768
+                row_clipped = True
+            elif v > 32767:
+                v = 32767
+                row_clipped = True
+            out[i, j] = v
+        if row_clipped:
+            clipped += 1
+    return clipped
+
+_numba_kernel = False  # False: not tried yet, None: numba unavailable
+
+def _get_numba_kernel():
+    """
+    _quantize_loop compiled with numba's njit, or None without numba.
+    numba is optional and slow to import, so it's only imported the first
+    time an input is large enough to use it.
+    """
+    global _numba_kernel
+    if _numba_kernel is False:
+        try:
+            from numba import njit
+        except ImportError:
+            _numba_kernel = None
+        else:
+            _numba_kernel = njit(_quantize_loop)
+    return _numba_kernel
+
+def _load_quantize_lib(directory=None):
+    """
+    quantize_chase() from the optional native library built from
+    gta_quantize.c (see that file) in `directory`, by default next to this
+    script, or None.
+    """
+    if np is None:
+        return None
+    here = Path(directory) if directory is not None else Path(__file__).resolve().parent
+    for name in ("gta_quantize.so", "gta_quantize.dll", "gta_quantize.dylib"):
+        path = here / name
+        if not path.exists():
+            continue
+        try:
+            fn = ctypes.CDLL(str(path)).quantize_chase
+        except (OSError, AttributeError):
+            continue
+        fn.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_double]
+        fn.restype = ctypes.c_longlong
+        return fn
+    return None
+
+_quantize_c = _load_quantize_lib()
+
+def _quantize_positions(positions, multiplier):
+    """Return (int16 (N,3) node positions, clipped entry count)."""
+    if _quantize_c is not None:
+        # the kernel works on native-endian buffers; numpy converts to/from
+        # the little-endian file layouts on assignment
+        src = np.ascontiguousarray(positions, dtype=np.float32)
+        node_pos = np.empty((len(src), 3), dtype=np.int16)
+        clipped = _quantize_c(src.ctypes.data, node_pos.ctypes.data, len(src), float(multiplier))
+        if clipped < 0:
+            raise ValueError("cannot convert non-finite position to node coordinates")
+        return node_pos, int(clipped)
+    kernel = _get_numba_kernel() if len(positions) >= NUMBA_MIN_ENTRIES else None
+    if kernel is not None:
+        node_pos = np.empty((len(positions), 3), dtype="<i2")
+        clipped = kernel(np.ascontiguousarray(positions), float(multiplier), node_pos)
+        if clipped < 0:
+            raise ValueError("cannot convert non-finite position to node coordinates")
+        return node_pos, clipped
+    # float64 like the struct path, so rounding matches it exactly; one
+    # scratch array, rounded and clipped in place before the int16 cast
+    scaled = np.multiply(positions, float(multiplier), dtype=np.float64)
+    np.rint(scaled, out=scaled)
+    if not np.isfinite(scaled).all():
+        raise ValueError("cannot convert non-finite position to node coordinates")
+    clipped = int(np.count_nonzero(((scaled < -32768) | (scaled > 32767)).any(axis=1)))
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return scaled.astype("<i2"), clipped
+
+def _convert_array_to_nodes(positions, multiplier, defaults, verbose=False):
+    """numpy version of convert_positions_to_nodes for an (N,3) positions array."""
+    count = len(positions)
+    node_pos, clipped = _quantize_positions(positions, multiplier)
+
+    node_bytes = bytearray(HEADER_SIZE + NODES_ENTRY_SIZE * count)
+    S_HEADER.pack_into(node_bytes, 0, count, 0, 0, 0, 0)
+    # writable view over the zeroed buffer; fields are filled in place
+    nodes = np.frombuffer(node_bytes, dtype=NODE_DT, count=count, offset=HEADER_SIZE)
+    nodes["pos"] = node_pos
+    nodes["node_id"] = np.arange(count) & 0xFFFF
+    nodes["area_id"], nodes["width"], nodes["node_type"], nodes["flags"] = _node_defaults(defaults)
+
+    log_lines = []
+    if verbose:
+        log_lines = [f"{idx}: pos=({px:.3f},{py:.3f},{pz:.3f}) -> nodePos=({xi},{yi},{zi}) id={idx & 0xFFFF}"
+                     for idx, ((px, py, pz), (xi, yi, zi)) in enumerate(zip(positions.tolist(), node_pos.tolist()))]
+
+    return node_bytes, log_lines, clipped
+
+# ------------ File conversion wrappers used by the worker pools ------------
+def convert_chase_data(data, config: dict, defaults: dict):
+    """
+    CPU half of a conversion: parse chase bytes and build nodes.dat.
+    Returns dict with variant, entries, binary, lines, clipped
+    (None if the variant is unknown).
+    """
+    positions, variant = parse_chase_positions(data)
+    if positions is None:
+        return None
+    # per-entry lines only ever end up in per-file logs
+    verbose = config.get("verbose_log", False) and config.get("per_file_log", False)
+    binary, lines, clipped = convert_positions_to_nodes(positions, config["multiplier"], defaults, verbose)
+    return {"variant": variant, "entries": len(positions), "binary": binary, "lines": lines, "clipped": clipped}
+
+def write_conversion(chase_path: Path, out_path: Path, result: dict, start: str, backup: bool, per_file_log: bool):
+    """I/O half of a conversion: backup, nodes file and optional log. Returns (success, msg, details)."""
+    # Ensure output folder exists
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Backup if requested and output exists (not backing up the source)
+    if backup and out_path.exists():
+        bak = out_path.with_suffix(out_path.suffix + ".bak")
+        shutil.copy2(out_path, bak)
+
+    # Write nodes file
+    write_file(out_path, result["binary"])
+
+    entries, clipped = result["entries"], result["clipped"]
+    details = {"entries": entries, "clipped": clipped, "variant": result["variant"]}
+
+    # Write log next to output
+    if per_file_log:
+        log_path = out_path.with_name(out_path.stem + "_chase_to_nodes_log.txt")
+        with open(log_path, "w", encoding="utf-8", errors="backslashreplace") as L:
+            L.write(f"Converted: {chase_path}\n")
+            L.write(f"Variant: {result['variant']}-byte entries\n")
+            L.write(f"Time (UTC): {start}\n")
+            L.write(f"Entries: {entries}\n")
+            L.write(f"Clipped: {clipped}\n")
+            if result["lines"]:
+                L.write("\n")
+                L.write("\n".join(result["lines"]))
+        details["log"] = str(log_path)
+
+    return True, f"Converted {chase_path.name} ({entries} entries, clipped={clipped})", details
 
-# ------------ File conversion wrapper used by threads ------------
 def convert_file_worker(chase_path: Path, out_path: Path, config: dict, defaults: dict, backup: bool):
     """
     Convert one file. Returns (success, msg, details)
@@ -145,37 +397,100 @@ def convert_file_worker(chase_path: Path, out_path: Path, config: dict, defaults
     """
     start = now()
     try:
-        data = chase_path.read_bytes()
-        parse_result, variant = parse_chase_positions(data)
-        if parse_result is None:
+        result = convert_chase_data(map_file(chase_path), config, defaults)
+        if result is None:
             return False, f"Unknown variant for {chase_path.name}", {"entries": 0}
-        entries = parse_result
-        binary, lines, clipped = convert_positions_to_nodes(entries, config["multiplier"], defaults)
+        return write_conversion(chase_path, out_path, result, start, backup, config.get("per_file_log", False))
+    except Exception as e:
+        return False, f"Error converting {chase_path.name}: {e}", {"entries": 0}
 
-        # Ensure output folder exists
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+async def convert_files_pipelined(file_pairs, executor, config: dict, defaults: dict, backup: bool, on_result, read_ahead: int):
+    """
+    Run the GUI batch on `executor`, at most `read_ahead` files in flight at
+    once. on_result(src, dst, (success, msg, details)) is called from the
+    loop thread as each file finishes, in completion order; an exception
+    from it is reported on stderr and doesn't stop the batch.
+
+    With a process pool (make_executor picks one for multi-file batches
+    unless multiprocess is off), file contents and nodes.dat blobs would be
+    pickled through the pool's pipe, so workers run convert_file_worker and
+    do their own I/O; inputs waiting for a worker are prefetched into the
+    page cache. Only with a thread pool (a single file, or multiprocess
+    off) is each file split into a read -> convert -> write pipeline: the
+    input is memory-mapped and the output written on asyncio's thread pool,
+    convert_chase_data runs on `executor`.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(read_ahead)
+    in_processes = isinstance(executor, ProcessPoolExecutor)
 
-        # Backup if requested and output exists (not backing up the source)
-        if backup and out_path.exists():
-            bak = out_path.with_suffix(out_path.suffix + ".bak")
-            shutil.copy2(out_path, bak)
+    async def one(src: Path, dst: Path):
+        async with slots:
+            start = now()
+            try:
+                if in_processes:
+                    await asyncio.to_thread(prefetch_files, [src])
+                    outcome = await loop.run_in_executor(executor, convert_file_worker, src, dst, config, defaults, backup)
+                else:
+                    data = await asyncio.to_thread(map_file, src)
+                    result = await loop.run_in_executor(executor, convert_chase_data, data, config, defaults)
+                    del data
+                    if result is None:
+                        outcome = False, f"Unknown variant for {src.name}", {"entries": 0}
+                    else:
+                        outcome = await asyncio.to_thread(write_conversion, src, dst, result, start, backup, config.get("per_file_log", False))
+            except Exception as e:
+                outcome = False, f"Error converting {src.name}: {e}", {"entries": 0}
+        try:
+            on_result(src, dst, outcome)
+        except Exception as e:
+            print(f"Result handler failed for {src.name}: {e}", file=sys.stderr)
 
-        # Write nodes file
-        out_path.write_bytes(binary)
+    await asyncio.gather(*(one(src, dst) for src, dst in file_pairs))
 
-        # Write log next to output
-        log_path = out_path.with_name(out_path.stem + "_chase_to_nodes_log.txt")
-        with open(log_path, "w") as L:
-            L.write(f"Converted: {chase_path}\n")
-            L.write(f"Variant: {variant}-byte entries\n")
-            L.write(f"Time (UTC): {start}\n")
-            L.write(f"Entries: {len(entries)}\n")
-            L.write(f"Clipped: {clipped}\n\n")
-            L.write("\n".join(lines))
+def open_batch_log(out_dir: Path, config: dict, total: int):
+    """
+    Open out_dir/batch_log.txt (UTF-8) for appending and write a batch
+    header, or return None when batch_log is off. Raises OSError if the
+    log can't be created. Only the thread collecting results writes to it,
+    so no locking is needed.
+    """
+    if not config.get("batch_log", True):
+        return None
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fh = open(out_dir / "batch_log.txt", "a", encoding="utf-8", errors="backslashreplace")
+    try:
+        fh.write(f"=== Batch (UTC) {now()}: {total} files, multiplier={config['multiplier']} ===\n")
+    except OSError:
+        fh.close()
+        raise
+    return fh
+
+def log_batch_result(fh, src: Path, dst: Path, outcome):
+    """One summary line per converted file in the batch log (write errors are reported, not raised)."""
+    if fh is None:
+        return
+    success, msg, details = outcome
+    variant = f" [{details['variant']}-byte]" if "variant" in details else ""
+    try:
+        fh.write(f"{'OK' if success else 'FAILED'} {src} -> {dst}{variant}: {msg}\n")
+    except (OSError, UnicodeError) as e:
+        print(f"Could not write batch log entry for {src.name}: {e}", file=sys.stderr)
 
-        return True, f"Converted {chase_path.name} ({len(entries)} entries, clipped={clipped})", {"entries": len(entries), "clipped": clipped, "log": str(log_path)}
-    except Exception as e:
-        return False, f"Error converting {chase_path.name}: {e}", {"entries": 0}
+def make_executor(config: dict, max_workers: int, jobs: int):
+    """
+    Pool for running convert_file_worker over `jobs` files, sized to at most
+    one worker per job. Returns (executor, number of workers).
+    Conversion is CPU-bound, so batches use one process per worker (the GIL
+    serializes threads); single files and multiprocess=False use threads.
+    Workers are never forked from this (multi-threaded) process: they start
+    via forkserver where available, spawn otherwise.
+    """
+    workers = max(1, min(max_workers, jobs))
+    if config.get("multiprocess", True) and jobs > 1:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)), workers
+    return ThreadPoolExecutor(max_workers=workers), workers
 
 # ------------ GUI application ------------
 class GTAConverterApp:
@@ -237,6 +552,21 @@ class GTAConverterApp:
         self.threads_var = tk.IntVar(value=self.config.get("threads", 4))
         ttk.Entry(settings_frame, textvariable=self.threads_var, width=4).grid(row=3, column=1, padx=4)
 
+        self.verbose_var = tk.BooleanVar(value=self.config.get("verbose_log", False))
+        self.verbose_check = ttk.Checkbutton(settings_frame, text="Per-entry log lines", variable=self.verbose_var)
+        self.verbose_check.grid(row=3, column=2, columnspan=2)
+
+        self.multiprocess_var = tk.BooleanVar(value=self.config.get("multiprocess", True))
+        ttk.Checkbutton(settings_frame, text="Use processes", variable=self.multiprocess_var).grid(row=4, column=0, columnspan=2)
+
+        self.per_file_log_var = tk.BooleanVar(value=self.config.get("per_file_log", False))
+        ttk.Checkbutton(settings_frame, text="Per-file logs", variable=self.per_file_log_var,
+                        command=self._sync_log_options).grid(row=4, column=2, columnspan=2)
+        self._sync_log_options()
+
+        self.batch_log_var = tk.BooleanVar(value=self.config.get("batch_log", True))
+        ttk.Checkbutton(settings_frame, text="Batch log", variable=self.batch_log_var).grid(row=5, column=0, columnspan=2)
+
         # Middle - treeview listing files
         self.tree = ttk.Treeview(root, columns=("path", "variant", "entries", "status"), show="headings", height=12)
         for c in ("path", "variant", "entries", "status"):
@@ -256,6 +586,7 @@ class GTAConverterApp:
 
         # internal
         self.selected_files = []
+        self._iid_by_path = {}  # str(path) -> tree item id
         self.executor = None
         self.stop_event = threading.Event()
 
@@ -284,20 +615,22 @@ class GTAConverterApp:
         self._clear_tree_status()
         for path in self.selected_files:
             try:
-                data = path.read_bytes()
-                variant = detect_chase_variant(data)
-                entries, _ = parse_chase_positions(data) if variant else (None, None)
-                if entries is not None:
-                    self._update_tree_row(path, variant, len(entries), "OK")
-                    self._log(f"{path.name}: variant={variant}, entries={len(entries)}")
+                # variant and entry count follow from the size alone;
+                # positions are only parsed when converting
+                size = path.stat().st_size
+                variant = variant_for_size(size)
+                if variant is not None:
+                    count = size // variant
+                    self._update_tree_row(path, variant, count, "OK")
+                    self._log(f"{path.name}: variant={variant}, entries={count}")
                 else:
                     # maybe it's nodes
                     # try to read header to see if nodes header present
                     with open(path, "rb") as f:
-                        header = f.read(20)
-                        if len(header) >= 20:
+                        header = f.read(HEADER_SIZE)
+                        if len(header) >= HEADER_SIZE:
                             try:
-                                total_nodes = struct.unpack("<I", header[:4])[0]
+                                total_nodes = S_HEADER.unpack(header)[0]
                                 self._update_tree_row(path, "nodes?", total_nodes, "NodeFile?")
                                 self._log(f"{path.name}: looks like nodes.dat (header total_nodes={total_nodes})")
                             except Exception:
@@ -318,8 +651,8 @@ class GTAConverterApp:
         for p in self.selected_files:
             out = p.with_name(p.stem + "_nodes.dat")
             out_files.append((p, out))
-        # run conversions in a thread pool
-        self._run_batch(out_files)
+        # run conversions in the worker pool
+        self._run_batch(out_files, out_files[0][1].parent)
 
     def batch_convert_folder(self):
         if not self.selected_files:
@@ -334,10 +667,10 @@ class GTAConverterApp:
         for p in self.selected_files:
             out = outdir / (p.stem + "_nodes.dat")
             out_files.append((p, out))
-        self._run_batch(out_files)
+        self._run_batch(out_files, outdir)
 
     # ---------- conversion orchestration ----------
-    def _run_batch(self, file_pairs):
+    def _run_batch(self, file_pairs, log_dir: Path):
         # save config from UI
         self.config["multiplier"] = float(self.mult_var.get())
         self.config["area_id"] = int(self.area_var.get())
@@ -346,6 +679,10 @@ class GTAConverterApp:
         self.config["flags"] = int(self.flags_var.get())
         self.config["backup"] = bool(self.backup_var.get())
         self.config["threads"] = int(self.threads_var.get())
+        self.config["verbose_log"] = bool(self.verbose_var.get())
+        self.config["multiprocess"] = bool(self.multiprocess_var.get())
+        self.config["per_file_log"] = bool(self.per_file_log_var.get())
+        self.config["batch_log"] = bool(self.batch_log_var.get())
         save_config(self.config)
 
         # prepare UI
@@ -354,36 +691,52 @@ class GTAConverterApp:
         self.progress["value"] = 0
         self.statusbar.config(text=f"Converting {total} files...")
 
-        # thread pool
+        try:
+            batch_log = open_batch_log(log_dir, self.config, total)
+        except OSError as e:
+            self._log(f"Batch log disabled: {e}")
+            batch_log = None
+
+        # worker pool
         max_workers = max(1, min(16, self.config["threads"]))
-        self._log(f"Starting conversion: {total} files, threads={max_workers}")
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        futures = []
-        for src, dst in file_pairs:
-            fut = self.executor.submit(convert_file_worker, src, dst, self.config, self.defaults, self.config["backup"])
-            futures.append((fut, src, dst))
-
-        # gather results asynchronously and push to UI queue
-        def waiter():
-            completed = 0
-            for fut, src, dst in futures:
-                try:
-                    success, msg, details = fut.result()
-                except Exception as e:
-                    success, msg, details = False, f"Exception: {e}", {}
-                completed += 1
-                ui_q.put(("progress", completed, total))
-                ui_q.put(("result", str(src), success, msg, details, str(dst)))
-            ui_q.put(("done", total))
-        threading.Thread(target=waiter, daemon=True).start()
+        self.executor, workers = make_executor(self.config, max_workers, total)
+        kind = "processes" if isinstance(self.executor, ProcessPoolExecutor) else "threads"
+        self._log(f"Starting conversion: {total} files, {kind}={workers}")
+        completed = 0
+
+        # runs on the pipeline's event loop thread; push results to UI queue
+        def on_result(src, dst, outcome):
+            nonlocal completed
+            success, msg, details = outcome
+            completed += 1
+            ui_q.put(("progress", completed, total))
+            ui_q.put(("result", str(src), success, msg, details, str(dst)))
+            log_batch_result(batch_log, src, dst, outcome)
+
+        # asyncio pipeline on its own thread so the Tk loop stays responsive
+        def runner(executor):
+            try:
+                asyncio.run(convert_files_pipelined(file_pairs, executor, self.config, self.defaults, self.config["backup"],
+                                                    on_result, read_ahead=2 * workers))
+            except Exception as e:
+                ui_q.put(("error", f"Batch aborted: {e}"))
+            finally:
+                executor.shutdown(wait=False)
+                if batch_log is not None:
+                    batch_log.close()
+                ui_q.put(("done", completed, total))
+        threading.Thread(target=runner, args=(self.executor,), daemon=True).start()
 
     # ---------- UI helpers & updates ----------
+    def _sync_log_options(self):
+        # per-entry lines only go to per-file logs
+        self.verbose_check.state(["!disabled"] if self.per_file_log_var.get() else ["disabled"])
+
     def _refresh_tree(self):
         # clear
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-        for p in self.selected_files:
-            self.tree.insert("", "end", values=(str(p), "-", "-", "Queued"))
+        self.tree.delete(*self.tree.get_children())
+        self._iid_by_path = {str(p): self.tree.insert("", "end", values=(str(p), "-", "-", "Queued"))
+                             for p in self.selected_files}
 
     def _clear_tree_status(self):
         for r in self.tree.get_children():
@@ -393,51 +746,61 @@ class GTAConverterApp:
             self.tree.item(r, values=vals)
 
     def _update_tree_row(self, path: Path, variant, entries, status):
-        # find tree item matching path
-        for r in self.tree.get_children():
-            vals = list(self.tree.item(r, "values"))
-            if vals[0] == str(path):
-                vals[1] = variant
-                vals[2] = entries
-                vals[3] = status
-                self.tree.item(r, values=vals)
-                return
-        # if not found, add it
-        self.tree.insert("", "end", values=(str(path), variant, entries, status))
+        values = (str(path), variant, entries, status)
+        iid = self._iid_by_path.get(str(path))
+        if iid is not None:
+            self.tree.item(iid, values=values)
+        else:
+            # if not found, add it
+            self._iid_by_path[str(path)] = self.tree.insert("", "end", values=values)
 
     def _log(self, text):
-        timestamped = f"[{now()}] {text}\n"
+        self._log_many([text])
+
+    def _log_many(self, texts):
+        # one widget update for a whole batch of lines
+        stamp = now()
         self.log.configure(state="normal")
-        self.log.insert("end", timestamped)
+        self.log.insert("end", "".join(f"[{stamp}] {t}\n" for t in texts))
         self.log.see("end")
         self.log.configure(state="disabled")
 
     def _process_ui_queue(self):
-        # handle messages from worker thread
+        # handle messages from worker thread; drain everything queued, then
+        # apply progress and log text once per tick
+        progress = None
+        lines = []
         try:
             while True:
                 item = ui_q.get_nowait()
                 if not item:
                     continue
                 if item[0] == "progress":
-                    completed, total = item[1], item[2]
-                    self.progress["value"] = completed
-                    self.statusbar.config(text=f"Progress: {completed}/{total}")
+                    progress = item[1], item[2]
                 elif item[0] == "result":
                     src, success, msg, details, dst = item[1], item[2], item[3], item[4], item[5]
-                    self._log(msg)
+                    lines.append(msg)
                     # update tree row for source file
                     try:
                         p = Path(src)
                         self._update_tree_row(p, "-", details.get("entries", "-"), "OK" if success else "Failed")
                     except Exception:
                         pass
+                elif item[0] == "error":
+                    lines.append(item[1])
                 elif item[0] == "done":
-                    self._log(f"Batch complete: {item[1]} files")
+                    progress = None
+                    lines.append(f"Batch complete: {item[1]}/{item[2]} files")
                     self.statusbar.config(text="Ready")
                     self.progress["value"] = 0
         except queue.Empty:
             pass
+        if progress is not None:
+            completed, total = progress
+            self.progress["value"] = completed
+            self.statusbar.config(text=f"Progress: {completed}/{total}")
+        if lines:
+            self._log_many(lines)
         # schedule again
         self.root.after(200, self._process_ui_queue)
 
@@ -449,25 +812,48 @@ def run_cli_batch(input_folder: Path, output_folder: Path, cfg: dict, defaults:
         return
     pairs = [(f, output_folder / (f.stem + "_nodes.dat")) for f in files]
     max_workers = max(1, min(16, cfg.get("threads", 4)))
-    print(f"Starting batch conversion: {len(pairs)} files, threads={max_workers}")
-    with ThreadPoolExecutor(max_workers=max_workers) as exec:
-        futures = {exec.submit(convert_file_worker, src, dst, cfg, defaults, backup): (src, dst) for src, dst in pairs}
-        for fut in as_completed(futures):
-            src, dst = futures[fut]
-            ok, msg, details = fut.result()
-            print(msg)
+    executor, workers = make_executor(cfg, max_workers, len(pairs))
+    kind = "processes" if isinstance(executor, ProcessPoolExecutor) else "threads"
+    print(f"Starting batch conversion: {len(pairs)} files, {kind}={workers}")
+    # keep reads for the next few files in flight while the current ones convert
+    ahead = 2 * workers
+    prefetch_files(src for src, _ in pairs[:ahead])
+    try:
+        batch_log = open_batch_log(output_folder, cfg, len(pairs))
+    except OSError as e:
+        print("Batch log disabled:", e)
+        batch_log = None
+    try:
+        with executor as exec:
+            futures = {exec.submit(convert_file_worker, src, dst, cfg, defaults, backup): (src, dst) for src, dst in pairs}
+            for done, fut in enumerate(as_completed(futures)):
+                src, dst = futures[fut]
+                ok, msg, details = fut.result()
+                print(msg)
+                log_batch_result(batch_log, src, dst, (ok, msg, details))
+                if ahead + done < len(pairs):
+                    prefetch_files([pairs[ahead + done][0]])
+    finally:
+        if batch_log is not None:
+            batch_log.close()
     print("Batch done.")
 
 # ------------ Main entrypoint ------------
 def main():
     parser = argparse.ArgumentParser(description="GTA DAT Toolkit — Inspector & Chase→Nodes")
     parser.add_argument("--cli-batch", help="Batch convert all .dat in INPUT folder to OUTPUT folder (usage: --cli-batch input:output)", default=None)
+    parser.add_argument("--per-file-log", action="store_true", help="Also write a <output>_chase_to_nodes_log.txt next to every converted file")
+    parser.add_argument("--no-batch-log", action="store_true", help="Don't append to batch_log.txt in the output folder")
     args = parser.parse_args()
 
     # load config
     load_config()
     cfg = DEFAULT_CONFIG.copy()
     defaults = {"area_id": cfg["area_id"], "width": cfg["width"], "node_type": cfg["node_type"], "flags": cfg["flags"]}
+    if args.per_file_log:
+        cfg["per_file_log"] = True
+    if args.no_batch_log:
+        cfg["batch_log"] = False
 
     if args.cli_batch:
         try:
@@ -487,4 +873,5 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # needed for process pools in PyInstaller builds
     main()
\ No newline at end of file
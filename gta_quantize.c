@@ -0,0 +1,147 @@
+/*
+ * Optional native kernel for GTA DAT Inspector: chase position quantization.
+ *
+ * Scales (x,y,z) float positions by the multiplier, rounds half-to-even and
+ * clips to int16, exactly like the Python paths (multiply done in double).
+ *
+ * Build next to "GTA DAT Inspector.py" and it is picked up automatically:
+ *   Linux:   cc -O3 -shared -fPIC gta_quantize.c -o gta_quantize.so
+ *   macOS:   cc -O3 -shared -fPIC gta_quantize.c -o gta_quantize.dylib
+ *   Windows: cl /O2 /LD gta_quantize.c /Fe:gta_quantize.dll
+ * With GCC/Clang and MSVC on x86 the AVX2 loop is selected at runtime, so the
+ * library still works on CPUs without AVX2. (Don't build with /arch:AVX2:
+ * MSVC would then emit AVX2 code in the scalar path too.)
+ * Define GTA_QUANTIZE_SCALAR_ONLY to leave the AVX2 loop out; the tests build
+ * both variants and check them against the Python paths.
+ *
+ * Both buffers are native-endian float/int16_t; the Python side hands in
+ * native np.float32/np.int16 arrays and converts to the little-endian
+ * nodes.dat layout itself.
+ */
+#include <math.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#if defined(_WIN32)
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT __attribute__((visibility("default")))
+#endif
+
+#if (defined(__GNUC__) || defined(__clang__)) && (defined(__x86_64__) || defined(__i386__))
+#define HAVE_AVX2 1
+#define AVX2_TARGET __attribute__((target("avx2")))
+#define CPU_HAS_AVX2() __builtin_cpu_supports("avx2")
+#elif defined(_MSC_VER) && (defined(_M_X64) || defined(_M_IX86))
+#define HAVE_AVX2 1
+#define AVX2_TARGET
+#define CPU_HAS_AVX2() msvc_has_avx2()
+#elif defined(__AVX2__)
+#define HAVE_AVX2 1
+#define AVX2_TARGET
+#define CPU_HAS_AVX2() 1
+#endif
+
+#ifdef GTA_QUANTIZE_SCALAR_ONLY
+#undef HAVE_AVX2
+#endif
+
+#ifdef HAVE_AVX2
+#include <immintrin.h>
+#endif
+
+#if defined(HAVE_AVX2) && defined(_MSC_VER)
+#include <intrin.h>
+
+/* CPU reports AVX2 and the OS saves YMM state (OSXSAVE + XCR0 bits 1-2). */
+static int msvc_has_avx2(void)
+{
+    int r[4];
+    __cpuid(r, 0);
+    if (r[0] < 7)
+        return 0;
+    __cpuid(r, 1);
+    if ((r[2] & (1 << 27 | 1 << 28)) != (1 << 27 | 1 << 28))
+        return 0;
+    if ((_xgetbv(0) & 6) != 6)
+        return 0;
+    __cpuidex(r, 7, 0);
+    return (r[1] >> 5) & 1;
+}
+#endif
+
+/* Entries [start, n): returns clipped entry count, -1 on NaN/inf. */
+static long long quantize_scalar(const float *xyz, int16_t *out, size_t start, size_t n, double mult)
+{
+    long long clipped = 0;
+    for (size_t i = start; i < n; i++) {
+        int row_clipped = 0;
+        for (int j = 0; j < 3; j++) {
+            double v = nearbyint((double)xyz[i * 3 + j] * mult);
+            if (!isfinite(v))
+                return -1;
+            if (v < -32768.0) {
+                v = -32768.0;
+                row_clipped = 1;
+            } else if (v > 32767.0) {
+                v = 32767.0;
+                row_clipped = 1;
+            }
+            out[i * 3 + j] = (int16_t)v;
+        }
+        clipped += row_clipped;
+    }
+    return clipped;
+}
+
+#ifdef HAVE_AVX2
+/* 4 entries (12 floats) per step as three vectors of 4 doubles. */
+AVX2_TARGET
+static long long quantize_avx2(const float *xyz, int16_t *out, size_t n, double mult)
+{
+    const __m256d vmult = _mm256_set1_pd(mult);
+    const __m256d lo = _mm256_set1_pd(-32768.0);
+    const __m256d hi = _mm256_set1_pd(32767.0);
+    const __m256d zero = _mm256_setzero_pd();
+    long long clipped = 0;
+    size_t i = 0;
+
+    for (; i + 4 <= n; i += 4) {
+        const float *src = xyz + i * 3;
+        int16_t *dst = out + i * 3;
+        unsigned oob = 0;
+        int finite = 1;
+        for (int k = 0; k < 3; k++) {
+            __m256d v = _mm256_mul_pd(_mm256_cvtps_pd(_mm_loadu_ps(src + k * 4)), vmult);
+            v = _mm256_round_pd(v, _MM_FROUND_TO_NEAREST_INT | _MM_FROUND_NO_EXC);
+            /* v - v is 0 only for finite v */
+            finite &= _mm256_movemask_pd(_mm256_cmp_pd(_mm256_sub_pd(v, v), zero, _CMP_EQ_OQ)) == 0xF;
+            oob |= (unsigned)_mm256_movemask_pd(_mm256_or_pd(_mm256_cmp_pd(v, lo, _CMP_LT_OQ),
+                                                             _mm256_cmp_pd(v, hi, _CMP_GT_OQ))) << (k * 4);
+            v = _mm256_min_pd(_mm256_max_pd(v, lo), hi);
+            __m128i w = _mm_packs_epi32(_mm256_cvtpd_epi32(v), _mm_setzero_si128());
+            _mm_storel_epi64((__m128i *)(dst + k * 4), w);
+        }
+        if (!finite)
+            return -1;
+        /* bits 3e..3e+2 belong to entry e; fold each triple onto its low bit */
+        oob = (oob | (oob >> 1) | (oob >> 2)) & 0x249u;
+        clipped += (oob & 1) + ((oob >> 3) & 1) + ((oob >> 6) & 1) + ((oob >> 9) & 1);
+    }
+    long long rest = quantize_scalar(xyz, out, i, n, mult);
+    return rest < 0 ? -1 : clipped + rest;
+}
+#endif
+
+/*
+ * xyz: n*3 floats, out: n*3 int16. Returns the number of entries with at
+ * least one clipped coordinate, or -1 if any scaled position is NaN/inf.
+ */
+EXPORT long long quantize_chase(const float *xyz, int16_t *out, size_t n, double mult)
+{
+#ifdef HAVE_AVX2
+    if (CPU_HAS_AVX2())
+        return quantize_avx2(xyz, out, n, mult);
+#endif
+    return quantize_scalar(xyz, out, 0, n, mult);
+}
@@ -0,0 +1,119 @@
+"""
+Parity of the native quantization kernel (gta_quantize.c) with the numpy
+and struct conversion paths. Builds the kernel with $CC (default cc) both
+with and without the AVX2 loop; skipped without numpy or a compiler.
+
+    python -m unittest discover tests
+"""
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+LIB_NAME = {"darwin": "gta_quantize.dylib", "win32": "gta_quantize.dll"}.get(sys.platform, "gta_quantize.so")
+DEFAULTS = {"area_id": 3, "width": 80, "node_type": 1, "flags": 2}
+
+spec = importlib.util.spec_from_file_location("gta_dat_inspector", ROOT / "GTA DAT Inspector.py")
+inspector = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(inspector)
+np = inspector.np
+
+
+def sample_positions():
+    """(N,3) float32 positions covering rounding ties, the int16 edges and random values."""
+    rows = []
+    # multiples of 0.0625 scale by 8 to exact .5 ties (round half to even)
+    ties = np.arange(-96, 96) * 0.0625
+    rows += ties.reshape(-1, 3).tolist()
+    edges = np.arange(-4096.25, -4095.5, 0.0625).tolist() + np.arange(4095.5, 4096.25, 0.0625).tolist()
+    # one coordinate at or past the int16 range per row, in each of x/y/z,
+    # e.g. -4096.0625 * 8 = -32768.5 rounds to -32768 and isn't clipped
+    for value in edges + [5000.0, -5000.0, 1e6, -1e6, 3.4e38, -3.4e38]:
+        for j in range(3):
+            row = [1.0, -2.0, 0.5]
+            row[j] = value
+            rows.append(row)
+    rows += [[5000.0, 5000.0, 5000.0], [-5000.0, 5000.0, -5000.0]]
+    rng = np.random.default_rng(1234)
+    rows += rng.uniform(-5000, 5000, size=(200, 3)).tolist()
+    positions = np.array(rows, dtype="<f4")
+    # mix the clipped rows into every slot of the kernel's 4-entry blocks
+    return positions[rng.permutation(len(positions))]
+
+
+class QuantizeKernelParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if np is None:
+            raise unittest.SkipTest("numpy is not installed")
+        cc = os.environ.get("CC", "cc")
+        if shutil.which(cc) is None:
+            raise unittest.SkipTest(f"no C compiler ({cc})")
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.kernels = {}
+        for name, flags in (("dispatch", []), ("scalar", ["-DGTA_QUANTIZE_SCALAR_ONLY"])):
+            out_dir = Path(cls.tmp.name) / name
+            out_dir.mkdir()
+            cmd = [cc, "-O3", "-shared", "-fPIC", *flags, str(ROOT / "gta_quantize.c"), "-o", str(out_dir / LIB_NAME)]
+            build = subprocess.run(cmd, capture_output=True, text=True)
+            if build.returncode != 0:
+                cls.tmp.cleanup()
+                raise unittest.SkipTest(f"building gta_quantize.c failed:\n{build.stderr}")
+            cls.kernels[name] = inspector._load_quantize_lib(out_dir)
+            assert cls.kernels[name] is not None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.kernels.clear()
+        cls.tmp.cleanup()
+
+    def convert(self, positions, kernel, multiplier=8.0):
+        with mock.patch.object(inspector, "_quantize_c", kernel), mock.patch.object(inspector, "_numba_kernel", None):
+            return inspector.convert_positions_to_nodes(positions, multiplier, DEFAULTS)
+
+    def assert_parity(self, positions, multiplier=8.0):
+        expected = inspector.convert_positions_to_nodes(positions.tolist(), multiplier, DEFAULTS)
+        binary, _, clipped = self.convert(positions, None, multiplier)
+        self.assertEqual((bytes(binary), clipped), (bytes(expected[0]), expected[2]), "numpy path")
+        for name, kernel in self.kernels.items():
+            binary, _, clipped = self.convert(positions, kernel, multiplier)
+            self.assertEqual((bytes(binary), clipped), (bytes(expected[0]), expected[2]), name)
+
+    def test_matches_python_paths(self):
+        positions = sample_positions()
+        self.assertGreater(self.convert(positions, None)[2], 0)
+        self.assertGreater(len(positions) - self.convert(positions, None)[2], 0)
+        for multiplier in (8.0, 1.0, 0.5, 3.7):
+            with self.subTest(multiplier=multiplier):
+                self.assert_parity(positions, multiplier)
+
+    def test_every_length_and_alignment(self):
+        positions = sample_positions()
+        for n in range(13):
+            with self.subTest(n=n):
+                self.assert_parity(positions[:n])
+        for start in range(1, 4):
+            with self.subTest(start=start):
+                self.assert_parity(np.ascontiguousarray(positions[start:]))
+
+    def test_non_finite_rows_raise(self):
+        positions = sample_positions()[:9]
+        for bad in (float("nan"), float("inf"), float("-inf")):
+            for i in range(len(positions)):
+                for j in range(3):
+                    broken = positions.copy()
+                    broken[i, j] = bad
+                    for name, kernel in (("numpy path", None), *self.kernels.items()):
+                        with self.subTest(bad=bad, row=i, coord=j, kernel=name):
+                            with self.assertRaises(ValueError):
+                                self.convert(broken, kernel)
+
+
+if __name__ == "__main__":
+    unittest.main()